@@ -1,9 +1,9 @@
-import re
-import subprocess
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader
 
+from truhanen.windowlayouts.windowlayouts import build_parser
+
 README_NAME = "README.md"
 README_TEMPLATE = Path(__file__).parent / README_NAME
 README_TARGET = Path(__file__).parents[1] / README_NAME
@@ -16,10 +16,8 @@ JINJA_ENV = Environment(
 def generate_readme():
     template = JINJA_ENV.get_template(README_NAME)
 
-    helptext = subprocess.check_output(["windowlayouts", "-h"]).decode().strip()
-    match_home = re.search(r"/home/[a-zA-Z0-9]+", helptext)
-    if match_home:
-        helptext = helptext.replace(match_home[0], "~")
+    helptext = build_parser().format_help().strip()
+    helptext = helptext.replace(str(Path.home()), "~")
     readme_contents = template.render(helptext=helptext)
 
     with open(README_TARGET, "w") as readme_file:
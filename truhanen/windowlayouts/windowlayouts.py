@@ -1,15 +1,28 @@
 import argparse
 import asyncio
 import configparser
+import functools
 import json
 import logging
 import re
+import shlex
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Match, Optional
 
 import appdirs
-from dataclasses_json import dataclass_json
+
+try:
+    # If orjson is available, use it for storing & opening window layouts.
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # If re2 is available, use it for linear-time matching of command output.
+    import re2 as re_fast
+except ImportError:
+    re_fast = re
 
 try:
     # If pandas is available, use it for extra logging.
@@ -22,34 +35,44 @@ __all__ = ["main"]
 
 LOG = logging.getLogger(__file__)
 
-# Serialization paths
-JSON_PATH = Path(appdirs.user_cache_dir("windowlayouts")) / "windowlayouts.json"
-
-# Configuration file
-CONFIG_DIR = Path(appdirs.user_config_dir("windowlayouts"))
-CONFIG_PATH = CONFIG_DIR / "config.ini"
+# Configuration file section
 CONFIG_SECTION_XRANDR_ARGS = "screenlayouts"
 
-# Regex pattern for `wmctrl -lpG` output
-REGEX_WMCTRL_WINDOW = re.compile(
-    r"(?P<window_id>0x[a-z0-9]+) +"
+# Regex pattern for `wmctrl -lpGx` output. The class & client machine columns
+# contain no whitespace, which keeps the match free of backtracking into the
+# window name.
+REGEX_WMCTRL_WINDOW = re_fast.compile(
+    r"(?m)^(?P<window_id>0x[a-z0-9]+) +"
     r"(?P<desktop_number>-?[0-9]+) +"
     r"(?P<process_id>[0-9]+) +"
     r"(?P<x>-?[0-9]+) +"
     r"(?P<y>-?[0-9]+) +"
     r"(?P<width>[0-9]+) +"
     r"(?P<height>[0-9]+) +"
-    r"[a-zA-Z0-9/]* +"
-    r"(?P<window_name>.+)"
+    r"(?P<window_class>\S+) +"
+    r"\S+ +"
+    r"(?P<window_name>[^\n]*)$"
 )
 
-# Regex pattern for xrandr output.
-REGEX_XRANDR_SCREEN = re.compile(
-    r"(?P<name>[a-zA-Z0-9-.]+) .+ "
+# Regex pattern for the rows of connected outputs in xrandr output. Rows of
+# disconnected outputs & modes fail to match already at the `connected` token.
+REGEX_XRANDR_SCREEN = re_fast.compile(
+    r"(?m)^(?P<name>[a-zA-Z0-9-.]+) connected [^\n]*?\b"
     r"(?P<width>[0-9]+)x"
     r"(?P<height>[0-9]+)"
-    r"(?P<x>[+-][0-9]*)"
-    r"(?P<y>[+-][0-9]*)"
+    r"(?P<x>[+-][0-9]+)"
+    r"(?P<y>[+-][0-9]+)"
+)
+
+# Prefix of the lines that separate windows in the output of SCRIPT_XPROP_WM_STATES
+XPROP_WINDOW_ID_PREFIX = "ID="
+
+# Shell script for querying the _NET_WM_STATE of all windows with a single call.
+# Windows closed during the loop are ignored, as their state isn't needed.
+SCRIPT_XPROP_WM_STATES = (
+    "for id in $(wmctrl -l | awk '{print $1}'); do "
+    f'echo "{XPROP_WINDOW_ID_PREFIX}$id"; xprop -id "$id" _NET_WM_STATE || true; '
+    "done"
 )
 
 # Desktop number used for sticky windows
@@ -59,31 +82,74 @@ DESKTOP_NUMBER_STICKY = -1
 WAIT_XRANDR_APPLY = 10
 
 
-@dataclass_json
 @dataclass
 class Position:
+    __slots__ = ("x", "y")
+
     x: int
     y: int
 
+    def to_dict(self) -> dict:
+        return {"x": self.x, "y": self.y}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Position":
+        return cls(x=data["x"], y=data["y"])
+
 
-@dataclass_json
 @dataclass
 class Size:
+    __slots__ = ("width", "height")
+
     width: int
     height: int
 
+    def to_dict(self) -> dict:
+        return {"width": self.width, "height": self.height}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Size":
+        return cls(width=data["width"], height=data["height"])
+
 
-@dataclass_json
 @dataclass
 class Screen:
+    __slots__ = ("name", "size", "position")
+
     name: str
     size: Size
     position: Position
 
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "size": self.size.to_dict(),
+            "position": self.position.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Screen":
+        return cls(
+            name=data["name"],
+            size=Size.from_dict(data["size"]),
+            position=Position.from_dict(data["position"]),
+        )
+
 
-@dataclass_json
 @dataclass
 class Window:
+    __slots__ = (
+        "name",
+        "window_class",
+        "window_id",
+        "process_id",
+        "desktop_number",
+        "position",
+        "size",
+        "maximized_horizontal",
+        "maximized_vertical",
+    )
+
     # The title of the window
     name: str
     # The class of the window
@@ -104,17 +170,81 @@ class Window:
     maximized_horizontal: bool
     maximized_vertical: bool
 
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "window_class": self.window_class,
+            "window_id": self.window_id,
+            "process_id": self.process_id,
+            "desktop_number": self.desktop_number,
+            "position": self.position.to_dict(),
+            "size": self.size.to_dict(),
+            "maximized_horizontal": self.maximized_horizontal,
+            "maximized_vertical": self.maximized_vertical,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Window":
+        return cls(
+            name=data["name"],
+            window_class=data["window_class"],
+            window_id=data["window_id"],
+            process_id=data["process_id"],
+            desktop_number=data["desktop_number"],
+            position=Position.from_dict(data["position"]),
+            size=Size.from_dict(data["size"]),
+            maximized_horizontal=data["maximized_horizontal"],
+            maximized_vertical=data["maximized_vertical"],
+        )
+
 
-@dataclass_json
 @dataclass
 class WindowLayout:
     """Window layout associated with a specific screen layout."""
 
+    __slots__ = ("screen_layout", "windows")
+
     screen_layout: List[Screen]
     windows: List[Window]
 
+    def to_dict(self) -> dict:
+        """Convert to json-serializable data with explicit field mapping."""
+        return {
+            "screen_layout": [screen.to_dict() for screen in self.screen_layout],
+            "windows": [window.to_dict() for window in self.windows],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WindowLayout":
+        """Create a WindowLayout from data created by `to_dict`."""
+        return cls(
+            screen_layout=[Screen.from_dict(s) for s in data["screen_layout"]],
+            windows=[Window.from_dict(window) for window in data["windows"]],
+        )
+
+
+def read_json(path: Path):
+    """Read json data from path, with orjson if it's available."""
+    with open(path, "rb") as f:
+        contents = f.read()
+    if orjson is not None:
+        return orjson.loads(contents)
+    return json.loads(contents)
+
+
+def write_json(path: Path, data):
+    """Write data as indented json to path, with orjson if it's available."""
+    if orjson is not None:
+        contents = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        contents = json.dumps(data, indent=2).encode()
+    with open(path, "wb") as f:
+        f.write(contents)
+
 
 def log_dataclass_list(dc_list: List[dataclass]):
+    if not LOG.isEnabledFor(logging.DEBUG):
+        return
     if pd is not None:
         with pd.option_context(
             "display.max_columns", 10, "display.max_rows", 1000, "display.width", 1000
@@ -126,6 +256,8 @@ def log_dataclass_list(dc_list: List[dataclass]):
 
 
 def log_window_layout(window_layout: WindowLayout, postfix: Optional[str] = None):
+    if not LOG.isEnabledFor(logging.DEBUG):
+        return
     window_layout_name = "window layout" + f" {postfix}" if postfix else ""
     LOG.debug(f"Screen layout of {window_layout_name}:")
     log_dataclass_list(window_layout.screen_layout)
@@ -139,10 +271,23 @@ def log_window_layouts(window_layouts: List[WindowLayout]):
         log_window_layout(layout, postfix=f"{i}")
 
 
+@functools.lru_cache(maxsize=None)
+def get_json_path() -> Path:
+    """Get the path of the file used for storing window layouts."""
+    return Path(appdirs.user_cache_dir("windowlayouts")) / "windowlayouts.json"
+
+
+@functools.lru_cache(maxsize=None)
+def get_config_path() -> Path:
+    """Get the path of the configuration file."""
+    return Path(appdirs.user_config_dir("windowlayouts")) / "config.ini"
+
+
+@functools.lru_cache(maxsize=1)
 def get_config_xrandr_args() -> Dict[str, List[str]]:
-    """Read xrandr argument configurations from CONFIG_PATH. Every line in a
-    multi-line value in CONFIG_PATH is handled as input for a single xrandr
-    call.
+    """Read xrandr argument configurations from the configuration file. Every
+    line in a multi-line value in the configuration file is handled as input for
+    a single xrandr call. The configuration is read only once per process.
 
     Returns
     -------
@@ -152,7 +297,7 @@ def get_config_xrandr_args() -> Dict[str, List[str]]:
         a valid xrandr input.
     """
     config = configparser.ConfigParser()
-    config.read(CONFIG_PATH)
+    config.read(get_config_path())
 
     xrandr_args = {}
     if CONFIG_SECTION_XRANDR_ARGS in config:
@@ -164,24 +309,30 @@ def get_config_xrandr_args() -> Dict[str, List[str]]:
     return xrandr_args
 
 
-async def run_command(command: str) -> str:
-    """Run a shell command & return its output.
+def shell_join(argv: List[str]) -> str:
+    """Join command arguments into a shell-escaped command string."""
+    return " ".join(shlex.quote(arg) for arg in argv)
+
+
+async def run_command(argv: List[str]) -> str:
+    """Run a command without a shell & return its output.
 
     Raises
     ------
     RuntimeError
         If the command returns a non-zero exit code.
     """
-    LOG.debug(f"Run shell command '{command}'.")
-    process = await asyncio.create_subprocess_shell(
-        command,
+    command = shell_join(argv)
+    LOG.debug(f"Run command '{command}'.")
+    process = await asyncio.create_subprocess_exec(
+        *argv,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
     )
     stdout, stderr = await process.communicate()
     if process.returncode != 0:
         raise RuntimeError(
-            f"Shell command `{command}` returned exit code {process.returncode}. "
+            f"Command `{command}` returned exit code {process.returncode}. "
             f"Stderr:\n{stderr.decode()}"
         )
     return stdout.decode()
@@ -189,7 +340,9 @@ async def run_command(command: str) -> str:
 
 async def notify(message: str, seconds: int = 5):
     """Notify user with notify-send."""
-    await run_command(f"notify-send -t {seconds * 1000} -a 'Windowlayouts' '{message}'")
+    await run_command(
+        ["notify-send", "-t", str(seconds * 1000), "-a", "Windowlayouts", message]
+    )
 
 
 async def apply_xrandr_args(xrandr_args: List[str]):
@@ -216,16 +369,18 @@ async def apply_xrandr_args(xrandr_args: List[str]):
     """
     # Call xrandr without arguments as a workaround for suspended displays.
     for _ in range(2):
-        await run_command(f"xrandr")
+        await run_command(["xrandr"])
         await asyncio.sleep(1)
 
-    xrandr_args_single = " ".join(xrandr_args)
+    xrandr_argvs = [shlex.split(xrandr_arg) for xrandr_arg in xrandr_args]
     try:
         # First call with `--dryrun` to ensure there's no problems.
-        await run_command(f"xrandr --dryrun {xrandr_args_single}")
+        await run_command(
+            ["xrandr", "--dryrun"] + [arg for argv in xrandr_argvs for arg in argv]
+        )
         # Apply the xrandr inputs sequentially for stability.
-        for xrandr_arg in xrandr_args:
-            await run_command(f"xrandr {xrandr_arg}")
+        for xrandr_argv in xrandr_argvs:
+            await run_command(["xrandr"] + xrandr_argv)
             await asyncio.sleep(0.1)
     except RuntimeError as e:
         message = e.args[0]
@@ -236,12 +391,8 @@ async def apply_xrandr_args(xrandr_args: List[str]):
         raise RuntimeError(f"Could not set screen layout: {message}") from e
 
 
-def parse_screen(xrandr_row: str) -> Optional[Screen]:
-    match = re.search(REGEX_XRANDR_SCREEN, xrandr_row)
-
-    if not match:
-        return None
-
+def parse_screen(match: Match) -> Screen:
+    """Create a Screen from a match of `REGEX_XRANDR_SCREEN` in xrandr output."""
     return Screen(
         name=match.group("name"),
         size=Size(
@@ -255,20 +406,38 @@ def parse_screen(xrandr_row: str) -> Optional[Screen]:
     )
 
 
-async def parse_window(wmctrl_row: str) -> Optional[Window]:
+async def get_all_wm_states() -> Dict[str, str]:
+    """Get the _NET_WM_STATE xprop output of all windows with a single shell
+    call instead of running xprop separately for each window.
+
+    Returns
+    -------
+    wm_states
+        A mapping from window identifiers to the xprop output of the windows.
+    """
+    xprop_output = await run_command(["sh", "-c", SCRIPT_XPROP_WM_STATES])
+    wm_states = {}
+    window_id = None
+    for line in xprop_output.splitlines():
+        if line.startswith(XPROP_WINDOW_ID_PREFIX):
+            window_id = line[len(XPROP_WINDOW_ID_PREFIX) :]
+            wm_states[window_id] = ""
+        elif window_id is not None:
+            wm_states[window_id] += line
+    return wm_states
+
+
+def parse_window(match: Match, wm_states: Dict[str, str]) -> Window:
     """Create a Window from wmctrl output.
 
     Parameters
     ----------
-    wmctrl_row
-        Output row from `wmctrl -lpG`. None will be returned if this doesn't
-        match the expected format `REGEX_WMCTRL_WINDOW`.
+    match
+        Match of `REGEX_WMCTRL_WINDOW` in the output of `wmctrl -lpGx`.
+    wm_states
+        Output of `get_all_wm_states`, used for the maximized state of the
+        window.
     """
-    match = REGEX_WMCTRL_WINDOW.match(wmctrl_row)
-
-    if not match:
-        return None
-
     window_id = match.group("window_id")
 
     position = Position(
@@ -281,13 +450,13 @@ async def parse_window(wmctrl_row: str) -> Optional[Window]:
         height=int(match.group("height")),
     )
 
-    xprop_state = await run_command(f"xprop -id {window_id} _NET_WM_STATE")
+    xprop_state = wm_states.get(window_id, "")
     maximized_horizontal = "_NET_WM_STATE_MAXIMIZED_HORZ" in xprop_state
     maximized_vertical = "_NET_WM_STATE_MAXIMIZED_VERT" in xprop_state
 
     return Window(
         name=match.group("window_name"),
-        window_class="",
+        window_class=match.group("window_class"),
         window_id=window_id,
         process_id=match.group("process_id"),
         desktop_number=int(match.group("desktop_number")),
@@ -298,39 +467,50 @@ async def parse_window(wmctrl_row: str) -> Optional[Window]:
     )
 
 
-async def restore_window(window: Window):
+async def restore_window(window: Window, desktop_count: int):
     """Restore the position & size of one window. After calling this function
     the values in window may not be up-to-date.
+
+    Parameters
+    ----------
+    window
+        The stored window to restore.
+    desktop_count
+        The current number of virtual desktops.
     """
     window_id = window.window_id
 
     # Guard for changes in the number of desktops.
-    current_desktop_count = len((await run_command("wmctrl -d")).split("\n"))
-    desktop_number = min(window.desktop_number, current_desktop_count)
+    desktop_number = min(window.desktop_number, desktop_count - 1)
+
+    # Collect the wmctrl calls to run them in a single compound command.
+    wmctrl_window = ["wmctrl", "-i", "-r", window_id]
+    commands = []
 
     # Maximize to break tiling.
-    await run_command(f"wmctrl -i -r {window_id} -b add,maximized_vert,maximized_horz")
+    commands.append(wmctrl_window + ["-b", "add,maximized_vert,maximized_horz"])
 
     # Unmaximize before moving.
-    await run_command(
-        f"wmctrl -i -r {window_id} -b remove,maximized_vert,maximized_horz"
-    )
+    commands.append(wmctrl_window + ["-b", "remove,maximized_vert,maximized_horz"])
 
     # Set desktop number or sticky value.
     if desktop_number == DESKTOP_NUMBER_STICKY:
-        await run_command(f"wmctrl -i -r {window_id} -b add,sticky")
+        commands.append(wmctrl_window + ["-b", "add,sticky"])
     else:
-        await run_command(f"wmctrl -i -r {window_id} -b remove,sticky")
-        await run_command(f"wmctrl -i -r {window_id} -t {desktop_number}")
+        commands.append(wmctrl_window + ["-b", "remove,sticky"])
+        commands.append(wmctrl_window + ["-t", str(desktop_number)])
 
     # Set size & position.
-    await run_command(
-        f"wmctrl -i -r {window_id} -e "
-        f"0,"
-        f"{window.position.x},"
-        f"{window.position.y},"
-        f"{window.size.width},"
-        f"{window.size.height}"
+    commands.append(
+        wmctrl_window
+        + [
+            "-e",
+            f"0,"
+            f"{window.position.x},"
+            f"{window.position.y},"
+            f"{window.size.width},"
+            f"{window.size.height}",
+        ]
     )
 
     # Set maximized state.
@@ -339,28 +519,33 @@ async def restore_window(window: Window):
         ("maximized_vert", "maximized_horz"),
     ):
         if maximized_value:
-            await run_command(f"wmctrl -i -r {window_id} -b add,{property_name}")
+            commands.append(wmctrl_window + ["-b", f"add,{property_name}"])
+
+    await run_command(
+        ["sh", "-c", " && ".join(shell_join(argv) for argv in commands)]
+    )
 
 
 async def get_current_window_layout() -> WindowLayout:
     """Get the current screen & window layout."""
     LOG.debug("Get current window layout.")
 
+    # Run the independent queries concurrently.
+    xrandr_output, wmctrl_output, wm_states = await asyncio.gather(
+        run_command(["xrandr"]),
+        run_command(["wmctrl", "-lpGx"]),
+        get_all_wm_states(),
+    )
+
     # Get the current screen layout.
-    xrandr_rows = (await run_command("xrandr")).split("\n")
-    screen_layout = []
-    for xrandr_row in xrandr_rows:
-        screen = parse_screen(xrandr_row)
-        if isinstance(screen, Screen):
-            screen_layout.append(screen)
+    screen_layout = [
+        parse_screen(match) for match in REGEX_XRANDR_SCREEN.finditer(xrandr_output)
+    ]
 
     # Get the current windows.
-    wmctrl_rows = (await run_command("wmctrl -lpG")).split("\n")
-    get_window_tasks = [asyncio.create_task(parse_window(row)) for row in wmctrl_rows]
     windows = [
-        window
-        for window in await asyncio.gather(*get_window_tasks)
-        if isinstance(window, Window)
+        parse_window(match, wm_states)
+        for match in REGEX_WMCTRL_WINDOW.finditer(wmctrl_output)
     ]
 
     window_layout = WindowLayout(
@@ -373,20 +558,50 @@ async def get_current_window_layout() -> WindowLayout:
     return window_layout
 
 
-def open_stored_window_layouts() -> List[WindowLayout]:
-    """Open previously stored window layouts."""
-    if not JSON_PATH.exists():
-        return []
+def get_screen_layout_key(screen_layout: List[Screen]) -> str:
+    """Get the key that identifies a screen layout in the stored window layouts,
+    e.g. "eDP-1:1920x1080+0+0,HDMI-1:1920x1080+1920+0".
+    """
+    return ",".join(
+        f"{screen.name}:"
+        f"{screen.size.width}x{screen.size.height}"
+        f"{screen.position.x:+d}{screen.position.y:+d}"
+        for screen in screen_layout
+    )
+
 
-    LOG.info(f"Open stored window layouts from '{JSON_PATH}'.")
-    with open(JSON_PATH) as f:
-        json_data = json.load(f)
-    window_layouts = [WindowLayout.from_dict(layout_data) for layout_data in json_data]
+def open_stored_window_layouts() -> Dict[str, dict]:
+    """Open previously stored window layouts.
 
-    LOG.debug("Currently stored window layouts:")
-    log_window_layouts(window_layouts)
+    Returns
+    -------
+    window_layouts
+        A mapping from `get_screen_layout_key` of the screen layouts to the
+        stored window layout data. The data is decoded lazily with
+        `WindowLayout.from_dict` so that only the needed layout gets decoded.
+    """
+    json_path = get_json_path()
+    if not json_path.exists():
+        return {}
+
+    LOG.info(f"Open stored window layouts from '{json_path}'.")
+    json_data = read_json(json_path)
+    if isinstance(json_data, list):
+        # Convert the former format, a list of window layouts.
+        json_data = {
+            get_screen_layout_key(
+                [Screen.from_dict(screen) for screen in layout_data["screen_layout"]]
+            ): layout_data
+            for layout_data in json_data
+        }
+
+    if LOG.isEnabledFor(logging.DEBUG):
+        LOG.debug("Currently stored window layouts:")
+        log_window_layouts(
+            [WindowLayout.from_dict(layout_data) for layout_data in json_data.values()]
+        )
 
-    return window_layouts
+    return json_data
 
 
 async def store_current_window_layout(**_):
@@ -397,28 +612,29 @@ async def store_current_window_layout(**_):
     window_layout_current = await get_current_window_layout()
 
     # Get stored window layouts, if any.
-    window_layouts_stored: List[WindowLayout] = open_stored_window_layouts()
+    window_layouts_stored = open_stored_window_layouts()
 
     # Add the current WindowLayout to the stored WindowLayouts, possibly replacing a
     # former WindowLayout with identical screen layout.
-    for i in range(len(window_layouts_stored)):
-        window_layout_stored = window_layouts_stored[i]
-        if window_layout_stored.screen_layout == window_layout_current.screen_layout:
-            LOG.info(f"Replace stored window layout {i}.")
-            window_layouts_stored[i] = window_layout_current
-            break
-    else:
-        window_layouts_stored.append(window_layout_current)
-
-    LOG.debug("Window layouts to be stored:")
-    log_window_layouts(window_layouts_stored)
+    key = get_screen_layout_key(window_layout_current.screen_layout)
+    if key in window_layouts_stored:
+        LOG.info(f"Replace stored window layout '{key}'.")
+    window_layouts_stored[key] = window_layout_current.to_dict()
+
+    if LOG.isEnabledFor(logging.DEBUG):
+        LOG.debug("Window layouts to be stored:")
+        log_window_layouts(
+            [
+                WindowLayout.from_dict(layout_data)
+                for layout_data in window_layouts_stored.values()
+            ]
+        )
 
     # Store WindowLayouts as json.
-    JSON_PATH.parent.mkdir(exist_ok=True, parents=True)
-    LOG.info(f"Store window layouts to '{JSON_PATH}'.")
-    data = [layout.to_dict() for layout in window_layouts_stored]
-    with open(JSON_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+    json_path = get_json_path()
+    json_path.parent.mkdir(exist_ok=True, parents=True)
+    LOG.info(f"Store window layouts to '{json_path}'.")
+    write_json(json_path, window_layouts_stored)
 
 
 async def restore_window_layout(**_):
@@ -435,23 +651,27 @@ async def restore_window_layout(**_):
     # Get the current window layout.
     window_layout_current = await get_current_window_layout()
 
-    # Restore window positions if ones with a matching screen layout have been stored.
-    restore_tasks = []
-    for i, window_layout_stored in enumerate(window_layouts_stored):
-        if window_layout_stored.screen_layout == window_layout_current.screen_layout:
-            LOG.info(f"Restore window layout {i}.")
-            window_map_current = {
-                window.window_id: window for window in window_layout_current.windows
-            }
-            for window_stored in window_layout_stored.windows:
-                if window_stored.window_id in window_map_current:
-                    restore_tasks.append(
-                        asyncio.create_task(restore_window(window_stored))
-                    )
-            break
+    # Nothing to do if no layout with a matching screen layout has been stored.
+    key = get_screen_layout_key(window_layout_current.screen_layout)
+    if key not in window_layouts_stored:
+        return
+
+    LOG.info(f"Restore window layout '{key}'.")
+    window_layout_stored = WindowLayout.from_dict(window_layouts_stored[key])
+
+    # Query the number of desktops once for all windows.
+    desktop_count = len((await run_command(["wmctrl", "-d"])).splitlines())
+
+    # Restore the positions of windows that still exist.
+    window_ids_current = {window.window_id for window in window_layout_current.windows}
+    restore_tasks = [
+        asyncio.create_task(restore_window(window_stored, desktop_count))
+        for window_stored in window_layout_stored.windows
+        if window_stored.window_id in window_ids_current
+    ]
     await asyncio.gather(*restore_tasks)
 
-    if LOG.level == logging.DEBUG:
+    if LOG.isEnabledFor(logging.DEBUG):
         await get_current_window_layout()
 
 
@@ -462,18 +682,19 @@ async def switch_screen_layout(screen_layout_name: str, **kwargs):
     a screen layout should be defined on a separate line in the configuration
     value. See examples/config.ini for example.
     """
-    # Store the current window layout.
-    await store_current_window_layout(**kwargs)
-
-    # Read xrandr arguments from CONFIG_PATH.
+    # Read xrandr arguments from the configuration file.
     config_xrandr_args = get_config_xrandr_args()
     if screen_layout_name not in config_xrandr_args:
         raise RuntimeError(
             f"Couldn't read configuration for screen layout '{screen_layout_name}' "
-            f"from '{CONFIG_PATH}'."
+            f"from '{get_config_path()}'. Configured screen layouts: "
+            f"{', '.join(config_xrandr_args) or 'none'}."
         )
     xrandr_args = config_xrandr_args[screen_layout_name]
 
+    # Store the current window layout.
+    await store_current_window_layout(**kwargs)
+
     LOG.info(f"Apply screen layout '{screen_layout_name}'.")
     try:
         await apply_xrandr_args(xrandr_args)
@@ -492,9 +713,9 @@ async def switch_screen_layout(screen_layout_name: str, **kwargs):
     await notify("Window layout ready")
 
 
-def parse_args() -> argparse.Namespace:
-    """Parse command line arguments."""
-    parser = argparse.ArgumentParser()
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser."""
+    parser = argparse.ArgumentParser(prog="windowlayouts")
     parser.add_argument(
         "--verbose",
         "-v",
@@ -514,16 +735,24 @@ def parse_args() -> argparse.Namespace:
 
     switch = subparsers.add_parser(
         "switch",
-        help=switch_screen_layout.__doc__.replace("CONFIG_PATH", str(CONFIG_PATH)),
+        help=switch_screen_layout.__doc__.replace(
+            "CONFIG_PATH", str(get_config_path())
+        ),
     )
     switch.set_defaults(func=switch_screen_layout)
+    # The configured names are validated in switch_screen_layout, so that the
+    # configuration file isn't read just for building the parser.
     switch.add_argument(
         "screen_layout_name",
-        choices=list(get_config_xrandr_args().keys()),
-        help=f"The name of a screen layout configured in {CONFIG_PATH}.",
+        help=f"The name of a screen layout configured in {get_config_path()}.",
     )
 
-    return parser.parse_args()
+    return parser
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    return build_parser().parse_args()
 
 
 def main():
@@ -532,7 +761,13 @@ def main():
     log_level = {0: logging.WARNING, 1: logging.INFO}.get(args.verbose, logging.DEBUG)
     logging.basicConfig(level=log_level)
 
-    asyncio.run(args.func(**vars(args)))
+    try:
+        # If uvloop is available, use it for faster subprocess handling.
+        from uvloop import run as run_async
+    except ImportError:
+        run_async = asyncio.run
+
+    run_async(args.func(**vars(args)))
 
 
 if __name__ == "__main__":